@@ -1,6 +1,9 @@
 
 from pathlib import Path
 import sqlite3
+import threading
+
+from app.data.queries import STATEMENT_CACHE_SIZE
 
 DATA_DIR = Path("DATA")
 DB_PATH = DATA_DIR / "intelligence_platform.db"
@@ -8,5 +11,41 @@ DB_PATH = DATA_DIR / "intelligence_platform.db"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 def connect_database(db_path=DB_PATH):
-    """Return a connection to the SQLite database."""
-    return sqlite3.connect(str(db_path))
+    """
+    Return a connection to the SQLite database.
+    The statement cache holds every registered query (see app.data.queries).
+    """
+    return sqlite3.connect(str(db_path), cached_statements=STATEMENT_CACHE_SIZE)
+
+
+# Long-lived connections per thread, so prepared statements are reused
+_thread_connections = threading.local()
+
+
+def get_connection(db_path=DB_PATH, read_only=False):
+    """
+    Return this thread's long-lived connection to db_path.
+
+    The connection stays open between calls so its statement cache keeps
+    hitting; callers must not close it. read_only opens the file with
+    mode=ro (used for replicas).
+    """
+    connections = _thread_connections.__dict__.setdefault("connections", {})
+    key = (str(db_path), read_only)
+    conn = connections.get(key)
+    if conn is None:
+        if read_only:
+            conn = sqlite3.connect(
+                f"file:{db_path}?mode=ro", uri=True, cached_statements=STATEMENT_CACHE_SIZE
+            )
+        else:
+            conn = connect_database(db_path)
+        connections[key] = conn
+    return conn
+
+
+def close_thread_connections():
+    """Close every connection opened by get_connection() in this thread."""
+    connections = _thread_connections.__dict__.pop("connections", {})
+    for conn in connections.values():
+        conn.close()
@@ -0,0 +1,331 @@
+import sys
+import threading
+import weakref
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.data.db import get_connection
+from app.data.queries import fetch_all
+
+EPOCH = date(1970, 1, 1)
+MISSING_DATE = -1
+MISSING_CODE = -1
+
+CATEGORY_COLUMNS = ("incident_type", "severity", "status", "reported_by")
+
+
+def encode_date(value):
+    """Return an ISO date string as days since 1970-01-01 (or MISSING_DATE)."""
+    if not value:
+        return MISSING_DATE
+    try:
+        return (date.fromisoformat(str(value)[:10]) - EPOCH).days
+    except ValueError:
+        return MISSING_DATE
+
+
+def decode_date(days):
+    """Return the ISO date string for a days-since-epoch integer (or None)."""
+    if days == MISSING_DATE:
+        return None
+    return (EPOCH + timedelta(days=int(days))).isoformat()
+
+
+class CategoryCodes:
+    """
+    Dictionary encoding for a low-cardinality text column.
+
+    Every distinct value is stored once; rows hold a small integer code.
+    """
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value):
+        """Return the code for value, adding it to the dictionary if new."""
+        if value is None:
+            return MISSING_CODE
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def lookup(self, value):
+        """Return the code for value without adding it (None if unknown)."""
+        if value is None:
+            return MISSING_CODE
+        return self.codes.get(value)
+
+    def decode(self, code):
+        """Return the original value for a code."""
+        if code == MISSING_CODE:
+            return None
+        return self.values[code]
+
+
+class IncidentRow:
+    """Lightweight read-only view of one incident in the working set."""
+
+    __slots__ = ("id", "date", "incident_type", "severity", "status", "reported_by")
+
+    def __init__(self, id, date, incident_type, severity, status, reported_by):
+        self.id = id
+        self.date = date
+        self.incident_type = incident_type
+        self.severity = severity
+        self.status = status
+        self.reported_by = reported_by
+
+    def __repr__(self):
+        return (
+            f"IncidentRow(id={self.id}, date={self.date!r}, "
+            f"incident_type={self.incident_type!r}, severity={self.severity!r}, "
+            f"status={self.status!r}, reported_by={self.reported_by!r})"
+        )
+
+
+class IncidentWorkingSet:
+    """
+    Compact in-memory copy of the cyber_incidents table.
+
+    Columns are kept in NumPy arrays owned by the working set:
+    - id as int64 (ascending, so lookups use binary search)
+    - date as int32 days since 1970-01-01
+    - incident_type, severity, status, reported_by as int32 dictionary codes
+
+    Descriptions are not held in memory; read them from the database by id
+    when needed. Call sync() to pull new rows using the highest loaded id as
+    a watermark. Status updates and deletes made through
+    update_incident_status() / delete_incident() in this process are applied
+    automatically; changes made by other processes are not seen.
+
+    Appends take a lock and grow by allocating new arrays, so readers that
+    already hold column slices are never invalidated.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.size = 0
+        self.ids = np.empty(0, dtype=np.int64)
+        self.dates = np.empty(0, dtype=np.int32)
+        self.alive = np.empty(0, dtype=bool)
+        self.categories = {name: CategoryCodes() for name in CATEGORY_COLUMNS}
+        self.columns = {name: np.empty(0, dtype=np.int32) for name in CATEGORY_COLUMNS}
+        self.watermark = 0
+        _working_sets.add(self)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive[:self.size]))
+
+    def _reserve(self, extra):
+        """Make room for extra more rows (caller holds the lock)."""
+        needed = self.size + extra
+        if needed <= len(self.ids):
+            return
+        capacity = max(needed, len(self.ids) + len(self.ids) // 2)
+
+        def grown(column):
+            new = np.empty(capacity, dtype=column.dtype)
+            new[:self.size] = column[:self.size]
+            return new
+
+        self.ids = grown(self.ids)
+        self.dates = grown(self.dates)
+        self.alive = grown(self.alive)
+        self.columns = {name: grown(column) for name, column in self.columns.items()}
+
+    def _append(self, incident_id, incident_date, incident_type, severity, status, reported_by):
+        """Add one row (caller holds the lock and has reserved space)."""
+        if incident_id <= self.watermark:
+            raise ValueError(f"Incident ids must be ascending: {incident_id} <= {self.watermark}")
+        pos = self.size
+        self.ids[pos] = incident_id
+        self.dates[pos] = encode_date(incident_date)
+        self.alive[pos] = True
+        values = (incident_type, severity, status, reported_by)
+        for name, value in zip(CATEGORY_COLUMNS, values):
+            self.columns[name][pos] = self.categories[name].encode(value)
+        self.size += 1
+        self.watermark = incident_id
+
+    def append(self, incident_id, incident_date, incident_type, severity, status, reported_by):
+        """Add one incident; its id must be above the current watermark."""
+        with self._lock:
+            self._reserve(1)
+            self._append(incident_id, incident_date, incident_type, severity, status, reported_by)
+
+    def sync(self, conn=None):
+        """
+        Load incidents with an id above the current watermark.
+
+        Args:
+            conn: Optional open connection (one is opened if omitted)
+
+        Returns:
+            int: Number of incidents added
+        """
+        if conn is None:
+            conn = get_connection()
+        rows = fetch_all(conn, "incidents.since_id", (self.watermark,))
+        with self._lock:
+            rows = [row for row in rows if row[0] > self.watermark]
+            self._reserve(len(rows))
+            for row in rows:
+                self._append(*row)
+        return len(rows)
+
+    def _position(self, incident_id):
+        """Return the row position for incident_id, or None."""
+        ids = self.ids[:self.size]
+        pos = int(np.searchsorted(ids, incident_id))
+        if pos < len(ids) and ids[pos] == incident_id and self.alive[pos]:
+            return pos
+        return None
+
+    def apply_status(self, incident_id, new_status):
+        """Mirror an update_incident_status() call. Returns True if found."""
+        with self._lock:
+            pos = self._position(incident_id)
+            if pos is None:
+                return False
+            self.columns["status"][pos] = self.categories["status"].encode(new_status)
+            return True
+
+    def discard(self, incident_id):
+        """Mirror a delete_incident() call. Returns True if found."""
+        with self._lock:
+            pos = self._position(incident_id)
+            if pos is None:
+                return False
+            self.alive[pos] = False
+            return True
+
+    def row(self, incident_id):
+        """Return an IncidentRow for incident_id, or None."""
+        pos = self._position(incident_id)
+        if pos is None:
+            return None
+        return self._row_at(pos)
+
+    def _row_at(self, pos):
+        values = [self.categories[name].decode(self.columns[name][pos]) for name in CATEGORY_COLUMNS]
+        return IncidentRow(int(self.ids[pos]), decode_date(self.dates[pos]), *values)
+
+    def _snapshot(self):
+        """Return (size, columns) as a consistent view of the loaded rows."""
+        with self._lock:
+            size = self.size
+            columns = dict(self.columns)
+            columns["id"] = self.ids
+            columns["date"] = self.dates
+            columns["alive"] = self.alive
+        return size, {name: column[:size] for name, column in columns.items()}
+
+    def _mask(self, columns, incident_type=None, severity=None, status=None, reported_by=None,
+              date_from=None, date_to=None):
+        result = columns["alive"].copy()
+        filters = {
+            "incident_type": incident_type,
+            "severity": severity,
+            "status": status,
+            "reported_by": reported_by,
+        }
+        for name, wanted in filters.items():
+            if wanted is None:
+                continue
+            if isinstance(wanted, str):
+                wanted = [wanted]
+            codes = [self.categories[name].lookup(value) for value in wanted]
+            codes = [code for code in codes if code is not None]
+            result &= np.isin(columns[name], codes)
+        if date_from is not None or date_to is not None:
+            dates = columns["date"]
+            result &= dates != MISSING_DATE
+            if date_from is not None:
+                result &= dates >= self._date_bound("date_from", date_from)
+            if date_to is not None:
+                result &= dates <= self._date_bound("date_to", date_to)
+        return result
+
+    @staticmethod
+    def _date_bound(name, value):
+        """Encode a filter date, rejecting values that are not ISO dates."""
+        days = encode_date(value)
+        if days == MISSING_DATE:
+            raise ValueError(f"{name} must be an ISO date (YYYY-MM-DD), got {value!r}")
+        return days
+
+    def mask(self, **filters):
+        """
+        Return a boolean NumPy mask of incidents matching all given filters.
+
+        Filters: incident_type, severity, status, reported_by (a single value
+        or a list of values) and date_from / date_to (inclusive ISO dates).
+        Raises ValueError if a date bound cannot be parsed.
+        """
+        _, columns = self._snapshot()
+        return self._mask(columns, **filters)
+
+    def filter(self, **filters):
+        """Return IncidentRow views for incidents matching the filters (see mask())."""
+        positions = np.flatnonzero(self.mask(**filters))
+        return [self._row_at(int(pos)) for pos in positions]
+
+    def count(self, **filters):
+        """Return the number of incidents matching the filters."""
+        return int(np.count_nonzero(self.mask(**filters)))
+
+    def count_by(self, column, **filters):
+        """
+        Count matching incidents grouped by a category column.
+
+        Returns:
+            dict: {value: count}, ordered by count descending
+        """
+        _, columns = self._snapshot()
+        codes = columns[column][self._mask(columns, **filters)]
+        values = list(self.categories[column].values)
+        missing = int(np.count_nonzero(codes == MISSING_CODE))
+        counts = np.bincount(codes[codes != MISSING_CODE], minlength=len(values))
+        result = {values[code]: int(n) for code, n in enumerate(counts) if n}
+        if missing:
+            result[None] = missing
+        return dict(sorted(result.items(), key=lambda item: item[1], reverse=True))
+
+    def memory_bytes(self):
+        """Bytes held by the column arrays (including spare capacity) and dictionaries."""
+        total = self.ids.nbytes + self.dates.nbytes + self.alive.nbytes
+        total += sum(column.nbytes for column in self.columns.values())
+        for codes in self.categories.values():
+            total += sys.getsizeof(codes.values) + sys.getsizeof(codes.codes)
+            total += sum(sys.getsizeof(value) for value in codes.values)
+        return total
+
+
+# Live working sets, kept in sync with writes made through app.data.incidents
+_working_sets = weakref.WeakSet()
+
+
+def notify_status_change(incident_id, new_status):
+    """Apply a status update to every live working set."""
+    for working_set in list(_working_sets):
+        working_set.apply_status(incident_id, new_status)
+
+
+def notify_delete(incident_id):
+    """Apply a delete to every live working set."""
+    for working_set in list(_working_sets):
+        working_set.discard(incident_id)
+
+
+def load_incident_working_set(conn=None):
+    """Build an IncidentWorkingSet and fill it from the database."""
+    working_set = IncidentWorkingSet()
+    working_set.sync(conn)
+    return working_set
@@ -1,21 +1,22 @@
-import pandas as pd
-from app.data.db import connect_database
+from app.data.db import get_connection
+from app.data.incident_store import notify_delete, notify_status_change
+from app.data.queries import execute, incident_filter, read_frame
+from app.data.replica import connect_for_read, note_write
 
 
 def insert_incident(date, incident_type, severity, status, description, reported_by=None):
     """
     Insert a new cyber incident and return the new incident id.
     """
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO cyber_incidents
+    conn = get_connection()
+    cursor = execute(
+        conn,
+        "incidents.insert",
         (date, incident_type, severity, status, description, reported_by)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (date, incident_type, severity, status, description, reported_by))
+    )
     conn.commit()
+    note_write()
     incident_id = cursor.lastrowid
-    conn.close()
     return incident_id
 
 
@@ -23,12 +24,20 @@ def get_all_incidents():
     """
     Return all incidents as a pandas DataFrame.
     """
-    conn = connect_database()
-    df = pd.read_sql_query(
-        "SELECT * FROM cyber_incidents ORDER BY id DESC",
-        conn
-    )
-    conn.close()
+    conn = connect_for_read()
+    df = read_frame(conn, "incidents.all")
+    return df
+
+
+def get_incidents(incident_type=None, severity=None, status=None, reported_by=None,
+                  date_from=None, date_to=None):
+    """
+    Return incidents matching the given filters as a pandas DataFrame.
+    Each filter accepts a single value or a list; dates are inclusive ISO strings.
+    """
+    query = incident_filter(incident_type, severity, status, reported_by, date_from, date_to)
+    conn = connect_for_read()
+    df = query.read_frame(conn)
     return df
 
 
@@ -36,15 +45,12 @@ def update_incident_status(incident_id, new_status):
     """
     Update the status of an existing incident.
     """
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE cyber_incidents SET status = ? WHERE id = ?",
-        (new_status, incident_id)
-    )
+    conn = get_connection()
+    cursor = execute(conn, "incidents.update_status", (new_status, incident_id))
     conn.commit()
+    note_write()
+    notify_status_change(incident_id, new_status)
     rows_updated = cursor.rowcount
-    conn.close()
     return rows_updated
 
 
@@ -52,60 +58,47 @@ def delete_incident(incident_id):
     """
     Delete an incident from the database.
     """
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
-        "DELETE FROM cyber_incidents WHERE id = ?",
-        (incident_id,)
-    )
+    conn = get_connection()
+    cursor = execute(conn, "incidents.delete", (incident_id,))
     conn.commit()
+    note_write()
+    notify_delete(incident_id)
     rows_deleted = cursor.rowcount
-    conn.close()
     return rows_deleted
 
 
-def get_incidents_by_type_count(conn):
+def _read_analytics(name, conn=None, params=None):
+    """
+    Run a registered read-only query. Without a connection, the query is
+    routed to a read replica when one is fresh enough.
+    """
+    if conn is None:
+        conn = connect_for_read()
+    return read_frame(conn, name, params)
+
+
+def get_incidents_by_type_count(conn=None):
     """
     Count incidents by type.
     Uses: SELECT, FROM, GROUP BY, ORDER BY
     """
-    query = """
-    SELECT incident_type, COUNT(*) AS count
-    FROM cyber_incidents
-    GROUP BY incident_type
-    ORDER BY count DESC
-    """
-    df = pd.read_sql_query(query, conn)
+    df = _read_analytics("incidents.count_by_type", conn)
     return df
 
 
-def get_high_severity_by_status(conn):
+def get_high_severity_by_status(conn=None):
     """
     Count high severity incidents by status.
     Uses: SELECT, FROM, WHERE, GROUP BY, ORDER BY
     """
-    query = """
-    SELECT status, COUNT(*) AS count
-    FROM cyber_incidents
-    WHERE severity = 'High'
-    GROUP BY status
-    ORDER BY count DESC
-    """
-    df = pd.read_sql_query(query, conn)
+    df = _read_analytics("incidents.high_severity_by_status", conn)
     return df
 
 
-def get_incident_types_with_many_cases(conn, min_count=5):
+def get_incident_types_with_many_cases(conn=None, min_count=5):
     """
     Find incident types with more than min_count cases.
     Uses: SELECT, FROM, GROUP BY, HAVING, ORDER BY
     """
-    query = """
-    SELECT incident_type, COUNT(*) AS count
-    FROM cyber_incidents
-    GROUP BY incident_type
-    HAVING COUNT(*) > ?
-    ORDER BY count DESC
-    """
-    df = pd.read_sql_query(query, conn, params=(min_count,))
+    df = _read_analytics("incidents.types_with_many_cases", conn, params=(min_count,))
     return df
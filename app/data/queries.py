@@ -0,0 +1,359 @@
+import time
+
+import pandas as pd
+
+from app.data.schema import REPORT_SOURCE_COLUMNS
+
+# One named, parameterized statement per data layer operation.
+# Keeping the SQL text identical for every call lets each connection
+# reuse its prepared statement instead of re-parsing.
+QUERIES = {
+    # users
+    "users.get_by_username": "SELECT * FROM users WHERE username = ?",
+    "users.list": "SELECT id, username, role FROM users",
+    "users.insert": "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+    "users.insert_or_ignore": (
+        "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)"
+    ),
+    "users.update_password_hash": (
+        "UPDATE users SET password_hash = ? WHERE username = ? AND password_hash = ?"
+    ),
+
+    # cyber incidents
+    "incidents.insert": """
+        INSERT INTO cyber_incidents
+        (date, incident_type, severity, status, description, reported_by)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    "incidents.all": "SELECT * FROM cyber_incidents ORDER BY id DESC",
+    "incidents.get_by_id": "SELECT * FROM cyber_incidents WHERE id = ?",
+    "incidents.since_id": """
+        SELECT id, date, incident_type, severity, status, reported_by
+        FROM cyber_incidents
+        WHERE id > ?
+        ORDER BY id
+    """,
+    "incidents.update_status": "UPDATE cyber_incidents SET status = ? WHERE id = ?",
+    "incidents.delete": "DELETE FROM cyber_incidents WHERE id = ?",
+    "incidents.count_by_type": """
+        SELECT incident_type, COUNT(*) AS count
+        FROM cyber_incidents
+        GROUP BY incident_type
+        ORDER BY count DESC
+    """,
+    "incidents.high_severity_by_status": """
+        SELECT status, COUNT(*) AS count
+        FROM cyber_incidents
+        WHERE severity = 'High'
+        GROUP BY status
+        ORDER BY count DESC
+    """,
+    "incidents.types_with_many_cases": """
+        SELECT incident_type, COUNT(*) AS count
+        FROM cyber_incidents
+        GROUP BY incident_type
+        HAVING COUNT(*) > ?
+        ORDER BY count DESC
+    """,
+
+    # table row counts (setup summary)
+    "count.users": "SELECT COUNT(*) FROM users",
+    "count.cyber_incidents": "SELECT COUNT(*) FROM cyber_incidents",
+    "count.datasets_metadata": "SELECT COUNT(*) FROM datasets_metadata",
+    "count.it_tickets": "SELECT COUNT(*) FROM it_tickets",
+
+    # report snapshots
+    "reports.max_change_seq": "SELECT COALESCE(MAX(seq), 0) FROM report_change_log",
+    "reports.changes_since": """
+        SELECT old_row, new_row
+        FROM report_change_log
+        WHERE table_name = ? AND seq > ?
+        ORDER BY seq
+    """,
+    "reports.insert_snapshot": """
+        INSERT INTO report_snapshots
+        (report_name, version, change_seq, state, result)
+        VALUES (?, ?, ?, ?, ?)
+    """,
+    "reports.latest_snapshot": """
+        SELECT version, change_seq, state, result, generated_at
+        FROM report_snapshots
+        WHERE report_name = ?
+        ORDER BY version DESC
+        LIMIT 1
+    """,
+    "reports.advance_snapshot": """
+        UPDATE report_snapshots SET change_seq = ?
+        WHERE report_name = ? AND version = ? AND change_seq < ?
+    """,
+    "reports.latest_version": "SELECT MAX(version) FROM report_snapshots WHERE report_name = ?",
+    "reports.prune_snapshots": """
+        DELETE FROM report_snapshots
+        WHERE version <= (
+            SELECT MAX(s.version) - ? FROM report_snapshots s
+            WHERE s.report_name = report_snapshots.report_name
+        )
+    """,
+    "reports.prune_changes": """
+        DELETE FROM report_change_log
+        WHERE seq <= (
+            SELECT MIN(latest) FROM (
+                SELECT MAX(change_seq) AS latest FROM report_snapshots
+                GROUP BY report_name
+            )
+        )
+    """,
+}
+
+# Full-table reads for the report pipeline, built from the fixed column lists
+for _table, _columns in REPORT_SOURCE_COLUMNS.items():
+    QUERIES[f"reports.source_rows.{_table}"] = f"SELECT {', '.join(_columns)} FROM {_table}"
+
+# Extra cache slots for statements produced by QueryFilter; never go below
+# sqlite3's default cache size of 128
+FILTER_STATEMENT_SLOTS = 32
+STATEMENT_CACHE_SIZE = max(128, len(QUERIES) + FILTER_STATEMENT_SLOTS)
+
+# name -> [calls, total_seconds, max_seconds]
+_timings = {}
+
+
+def record_timing(name, seconds):
+    """Add one execution time to the per-statement stats."""
+    stats = _timings.setdefault(name, [0, 0.0, 0.0])
+    stats[0] += 1
+    stats[1] += seconds
+    if seconds > stats[2]:
+        stats[2] = seconds
+
+
+def execute(conn, name, params=()):
+    """
+    Run a registered statement and return the cursor.
+    Use for writes; use fetch_one/fetch_all/read_frame for reads so the
+    timing includes fetching the rows.
+    """
+    start = time.perf_counter()
+    cursor = conn.execute(QUERIES[name], params)
+    record_timing(name, time.perf_counter() - start)
+    return cursor
+
+
+def fetch_one(conn, name, params=()):
+    """Run a registered query and return the first row (or None)."""
+    start = time.perf_counter()
+    row = conn.execute(QUERIES[name], params).fetchone()
+    record_timing(name, time.perf_counter() - start)
+    return row
+
+
+def fetch_all(conn, name, params=()):
+    """Run a registered query and return all rows."""
+    start = time.perf_counter()
+    rows = conn.execute(QUERIES[name], params).fetchall()
+    record_timing(name, time.perf_counter() - start)
+    return rows
+
+
+def read_frame(conn, name, params=None):
+    """Run a registered query and return a pandas DataFrame."""
+    start = time.perf_counter()
+    df = pd.read_sql_query(QUERIES[name], conn, params=params)
+    record_timing(name, time.perf_counter() - start)
+    return df
+
+
+def get_query_stats():
+    """
+    Return per-statement timing stats, slowest total first.
+
+    Returns:
+        list: dicts with name, calls, total_ms, avg_ms, max_ms
+    """
+    stats = [
+        {
+            "name": name,
+            "calls": calls,
+            "total_ms": total * 1000,
+            "avg_ms": total * 1000 / calls,
+            "max_ms": longest * 1000,
+        }
+        for name, (calls, total, longest) in _timings.items()
+    ]
+    return sorted(stats, key=lambda s: s["total_ms"], reverse=True)
+
+
+def print_query_stats(limit=10):
+    """Print the hottest statements by total time."""
+    print(f"{'Statement':<40} {'Calls':<8} {'Total ms':<10} {'Avg ms':<10} {'Max ms':<10}")
+    print("-" * 80)
+    for s in get_query_stats()[:limit]:
+        print(f"{s['name']:<40} {s['calls']:<8} {s['total_ms']:<10.2f} {s['avg_ms']:<10.3f} {s['max_ms']:<10.3f}")
+
+
+def reset_query_stats():
+    """Clear all recorded timings."""
+    _timings.clear()
+
+
+# Columns each filter may use; anything else is rejected
+FILTER_COLUMNS = {
+    "cyber_incidents": {
+        "id", "date", "incident_type", "severity", "status", "reported_by", "created_at",
+    },
+    "it_tickets": {
+        "id", "ticket_id", "priority", "status", "category", "created_date",
+        "resolved_date", "assigned_to", "created_at",
+    },
+}
+
+
+class QueryFilter:
+    """
+    Composable WHERE clause builder for incidents and tickets.
+
+    Conditions compare bare columns with placeholders (=, IN, >=, <=) so
+    SQLite can use the indexes from create_indexes(). Values are always
+    passed as parameters, and the generated SQL for the same filter shape
+    is identical, so it is served from the statement cache.
+
+    Example:
+        QueryFilter("cyber_incidents").equals("severity", "High") \\
+            .date_range("date", "2024-10-01", "2024-10-31").select()
+    """
+
+    def __init__(self, table):
+        if table not in FILTER_COLUMNS:
+            raise ValueError(f"Filtering is not supported for table '{table}'")
+        self.table = table
+        self.conditions = []
+        self.params = []
+
+    def _check(self, column):
+        if column not in FILTER_COLUMNS[self.table]:
+            raise ValueError(f"Unknown column '{column}' for table '{self.table}'")
+
+    def equals(self, column, value):
+        """Match one value, or any of a list of values. None is ignored."""
+        if value is None:
+            return self
+        self._check(column)
+        if isinstance(value, (list, tuple, set)):
+            values = list(value)
+            placeholders = ", ".join("?" for _ in values)
+            self.conditions.append(f"{column} IN ({placeholders})")
+            self.params.extend(values)
+        else:
+            self.conditions.append(f"{column} = ?")
+            self.params.append(value)
+        return self
+
+    def date_range(self, column, start=None, end=None):
+        """Inclusive ISO date range; either end may be None."""
+        self._check(column)
+        if start is not None:
+            self.conditions.append(f"{column} >= ?")
+            self.params.append(start)
+        if end is not None:
+            self.conditions.append(f"{column} <= ?")
+            self.params.append(end)
+        return self
+
+    def where(self):
+        """Return (where_clause, params); the clause is empty if no conditions."""
+        if not self.conditions:
+            return "", []
+        return " WHERE " + " AND ".join(self.conditions), list(self.params)
+
+    def _column_list(self, columns):
+        """Validate "*" or a list / comma-separated string of column names."""
+        if columns == "*":
+            return "*"
+        if isinstance(columns, str):
+            columns = columns.split(",")
+        names = [column.strip() for column in columns]
+        for name in names:
+            self._check(name)
+        return ", ".join(names)
+
+    def _order_by(self, order_by):
+        """Validate "column [ASC|DESC], ..." (a string or list of terms)."""
+        if isinstance(order_by, str):
+            order_by = order_by.split(",")
+        terms = []
+        for term in order_by:
+            parts = term.split()
+            if not parts or len(parts) > 2:
+                raise ValueError(f"Invalid ORDER BY term '{term}'")
+            self._check(parts[0])
+            direction = parts[1].upper() if len(parts) == 2 else "ASC"
+            if direction not in ("ASC", "DESC"):
+                raise ValueError(f"Sort direction must be ASC or DESC, got '{parts[1]}'")
+            terms.append(f"{parts[0]} {direction}")
+        return ", ".join(terms)
+
+    def select(self, columns="*", order_by="id DESC", limit=None):
+        """
+        Return (sql, params) for a filtered SELECT.
+        columns and order_by may only name columns in FILTER_COLUMNS.
+        """
+        where, params = self.where()
+        sql = f"SELECT {self._column_list(columns)} FROM {self.table}{where}"
+        if order_by:
+            sql += f" ORDER BY {self._order_by(order_by)}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return sql, params
+
+    def count_by(self, column):
+        """Return (sql, params) counting filtered rows grouped by column."""
+        self._check(column)
+        where, params = self.where()
+        sql = (
+            f"SELECT {column}, COUNT(*) AS count FROM {self.table}{where} "
+            f"GROUP BY {column} ORDER BY count DESC"
+        )
+        return sql, params
+
+    def fetch_all(self, conn, **select_args):
+        """Run select() on conn and return all rows, timed as '<table>.filter'."""
+        sql, params = self.select(**select_args)
+        start = time.perf_counter()
+        rows = conn.execute(sql, params).fetchall()
+        record_timing(f"{self.table}.filter", time.perf_counter() - start)
+        return rows
+
+    def read_frame(self, conn, **select_args):
+        """Run select() on conn and return a pandas DataFrame."""
+        sql, params = self.select(**select_args)
+        start = time.perf_counter()
+        df = pd.read_sql_query(sql, conn, params=params)
+        record_timing(f"{self.table}.filter", time.perf_counter() - start)
+        return df
+
+
+def incident_filter(incident_type=None, severity=None, status=None, reported_by=None,
+                    date_from=None, date_to=None):
+    """Return a QueryFilter for cyber_incidents from the common criteria."""
+    return (
+        QueryFilter("cyber_incidents")
+        .equals("incident_type", incident_type)
+        .equals("severity", severity)
+        .equals("status", status)
+        .equals("reported_by", reported_by)
+        .date_range("date", date_from, date_to)
+    )
+
+
+def ticket_filter(priority=None, status=None, category=None, assigned_to=None,
+                  created_from=None, created_to=None):
+    """Return a QueryFilter for it_tickets from the common criteria."""
+    return (
+        QueryFilter("it_tickets")
+        .equals("priority", priority)
+        .equals("status", status)
+        .equals("category", category)
+        .equals("assigned_to", assigned_to)
+        .date_range("created_date", created_from, created_to)
+    )
@@ -0,0 +1,244 @@
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from app.data.db import DB_PATH, close_thread_connections, connect_database, get_connection
+
+REPLICA_COUNT = 1
+MAX_STALENESS_SECONDS = 5.0
+SYNC_INTERVAL_SECONDS = 1.0
+
+
+class ReplicaSet:
+    """
+    Read-only copies of the primary database kept in sync with the SQLite
+    backup API.
+
+    start() switches the primary to WAL mode. Each sync then copies a
+    consistent snapshot inside a single read transaction, and WAL lets
+    writers commit while that copy runs. Without WAL, the copy would hold a
+    shared lock that blocks writers for its whole duration.
+
+    Reads go to a replica only while it is within max_staleness seconds of
+    the primary and the calling thread has not written since the last sync
+    (read-your-writes); otherwise they fall back to the primary.
+    """
+
+    def __init__(self, primary_path=DB_PATH, count=REPLICA_COUNT, max_staleness=MAX_STALENESS_SECONDS):
+        self.primary_path = Path(primary_path)
+        # Two files per replica: one serves reads while the other is refreshed
+        self.paths = [
+            [self.primary_path.with_name(f"{self.primary_path.stem}.replica{i}{side}.db") for side in "ab"]
+            for i in range(count)
+        ]
+        self.max_staleness = max_staleness
+        self.synced_at = None
+        self.generation = 0
+        self._next = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sync(self):
+        """
+        Copy the primary into every replica.
+
+        The copy is written to each replica's idle file and then made the
+        active one, so readers never see a half-written replica. The copy
+        runs as one backup step (a single read snapshot); with the primary
+        in WAL mode this does not block writers. A stepped copy would be
+        restarted by every concurrent write and might never finish.
+        """
+        started = time.monotonic()
+        idle = (self.generation + 1) % 2
+        source = sqlite3.connect(str(self.primary_path))
+        try:
+            for files in self.paths:
+                target = sqlite3.connect(str(files[idle]))
+                try:
+                    source.backup(target)
+                    # Replicas are read-only files; keep them out of WAL mode
+                    target.execute("PRAGMA journal_mode=DELETE")
+                finally:
+                    target.close()
+        finally:
+            source.close()
+        with self._lock:
+            self.generation += 1
+            self.synced_at = started
+
+    def note_write(self):
+        """Record that the calling thread has written to the primary."""
+        self._local.last_write = time.monotonic()
+
+    def is_fresh(self):
+        """Return True if the calling thread may read from a replica."""
+        if self.synced_at is None:
+            return False
+        if getattr(self._local, "last_write", 0.0) >= self.synced_at:
+            return False
+        return time.monotonic() - self.synced_at <= self.max_staleness
+
+    def connect_for_read(self):
+        """
+        Return this thread's read-only replica connection, or its primary
+        connection. Connections are long-lived; do not close them.
+        """
+        if not self.is_fresh():
+            return get_connection(self.primary_path)
+        with self._lock:
+            path = self.paths[self._next % len(self.paths)][self.generation % 2]
+            self._next += 1
+        return get_connection(path, read_only=True)
+
+    def enable_wal(self):
+        """Put the primary in WAL mode (persistent for the database file)."""
+        conn = connect_database(self.primary_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.close()
+
+    def start(self, interval=SYNC_INTERVAL_SECONDS):
+        """
+        Switch the primary to WAL, sync now, then keep syncing every
+        interval seconds in the background.
+        """
+        self.enable_wal()
+        self.sync()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop background syncing. Reads fall back to the primary once stale."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.sync()
+            except sqlite3.Error as e:
+                print(f"Replica sync failed: {e}")
+
+
+# Default replica set for the platform database (inactive until started)
+replicas = ReplicaSet()
+
+
+def connect_for_read():
+    """Return this thread's connection for read-only queries (replica when fresh)."""
+    return replicas.connect_for_read()
+
+
+def note_write():
+    """Record a write on the primary for read-your-writes routing."""
+    replicas.note_write()
+
+
+def benchmark_write_latency(rows=200_000, writes=2000, readers=2, write_interval=0.005):
+    """
+    Measure primary insert latency while analytics queries run:
+    - "primary": analytics on a rollback-journal primary (the old setup)
+    - "primary-wal": analytics on the primary in WAL mode, no replica
+    - "replica": analytics routed to a replica (primary in WAL mode)
+
+    Runs against a scratch database in a temporary directory.
+
+    Returns:
+        dict: {mode: {"p50_ms", "p99_ms", "p999_ms", "max_ms"}}
+    """
+    from app.data.schema import create_cyber_incidents_table
+
+    types = ["Phishing", "Malware", "DDoS", "Data Breach", "Ransomware"]
+    severities = ["Low", "Medium", "High", "Critical"]
+    statuses = ["Open", "In Progress", "Resolved", "Closed"]
+    analytics_query = """
+        SELECT incident_type, severity, status, COUNT(*) AS count
+        FROM cyber_incidents
+        GROUP BY incident_type, severity, status
+        ORDER BY count DESC
+    """
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        primary_path = Path(tmp_dir) / "bench.db"
+        conn = sqlite3.connect(str(primary_path))
+        create_cyber_incidents_table(conn)
+        conn.executemany("""
+            INSERT INTO cyber_incidents
+            (date, incident_type, severity, status, description, reported_by)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (
+            (f"2024-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+             random.choice(types), random.choice(severities), random.choice(statuses),
+             "benchmark incident", f"user{random.randint(1, 50)}")
+            for _ in range(rows)
+        ))
+        conn.commit()
+        conn.close()
+
+        for mode in ("primary", "primary-wal", "replica"):
+            replica_set = ReplicaSet(primary_path)
+            if mode == "primary-wal":
+                replica_set.enable_wal()
+            elif mode == "replica":
+                replica_set.start()
+            stop = threading.Event()
+
+            def run_analytics():
+                while not stop.is_set():
+                    read_conn = replica_set.connect_for_read()
+                    try:
+                        read_conn.execute(analytics_query).fetchall()
+                    except sqlite3.OperationalError:
+                        pass  # starved by the writer; try again
+                close_thread_connections()
+
+            threads = [threading.Thread(target=run_analytics) for _ in range(readers)]
+            for thread in threads:
+                thread.start()
+
+            write_conn = sqlite3.connect(str(primary_path), timeout=30)
+            latencies = []
+            for i in range(writes):
+                start = time.perf_counter()
+                write_conn.execute(
+                    "INSERT INTO cyber_incidents (date, incident_type, severity, status, description) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    ("2024-11-05", "Phishing", "High", "Open", f"benchmark write {i}"),
+                )
+                write_conn.commit()
+                latencies.append((time.perf_counter() - start) * 1000)
+                time.sleep(write_interval)
+            write_conn.close()
+
+            stop.set()
+            for thread in threads:
+                thread.join()
+            replica_set.stop()
+
+            latencies.sort()
+            results[mode] = {
+                "p50_ms": statistics.median(latencies),
+                "p99_ms": latencies[int(len(latencies) * 0.99) - 1],
+                "p999_ms": latencies[int(len(latencies) * 0.999) - 1],
+                "max_ms": latencies[-1],
+            }
+
+    print(f"{'Analytics on':<14} {'p50 ms':<10} {'p99 ms':<10} {'p99.9 ms':<10} {'max ms':<10}")
+    print("-" * 55)
+    for mode, stats in results.items():
+        print(f"{mode:<14} {stats['p50_ms']:<10.2f} {stats['p99_ms']:<10.2f} "
+              f"{stats['p999_ms']:<10.2f} {stats['max_ms']:<10.2f}")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_write_latency()
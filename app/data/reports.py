@@ -0,0 +1,85 @@
+import json
+
+from app.data.queries import execute, fetch_all, fetch_one
+from app.data.schema import REPORT_SOURCE_COLUMNS
+
+
+def get_max_change_seq(conn):
+    """Return the newest report_change_log sequence number (0 if empty)."""
+    return fetch_one(conn, "reports.max_change_seq")[0]
+
+
+def get_source_rows(conn, table_name):
+    """
+    Return every row of a report source table as a list of dicts,
+    limited to the columns in REPORT_SOURCE_COLUMNS.
+    """
+    columns = REPORT_SOURCE_COLUMNS[table_name]
+    rows = fetch_all(conn, f"reports.source_rows.{table_name}")
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def get_changes_since(conn, table_name, seq):
+    """
+    Return (old_row, new_row) dict pairs logged for a table after seq.
+    old_row is None for inserts and new_row is None for deletes.
+    """
+    rows = fetch_all(conn, "reports.changes_since", (table_name, seq))
+    return [
+        (json.loads(old) if old else None, json.loads(new) if new else None)
+        for old, new in rows
+    ]
+
+
+def insert_snapshot(conn, report_name, version, change_seq, state, result):
+    """Store a new snapshot version for a report."""
+    execute(
+        conn,
+        "reports.insert_snapshot",
+        (report_name, version, change_seq, json.dumps(state), json.dumps(result))
+    )
+    conn.commit()
+
+
+def advance_snapshot(conn, report_name, version, change_seq):
+    """
+    Mark a snapshot as current up to change_seq without publishing a new
+    version (used when none of its table's changes affected it).
+    """
+    execute(conn, "reports.advance_snapshot", (change_seq, report_name, version, change_seq))
+    conn.commit()
+
+
+def get_latest_snapshot(conn, report_name):
+    """
+    Return the newest snapshot for a report as a dict, or None.
+    Uses the (report_name, version) unique index, so no table scan.
+    """
+    row = fetch_one(conn, "reports.latest_snapshot", (report_name,))
+    if row is None:
+        return None
+    version, change_seq, state, result, generated_at = row
+    return {
+        "report_name": report_name,
+        "version": version,
+        "change_seq": change_seq,
+        "state": json.loads(state),
+        "result": json.loads(result),
+        "generated_at": generated_at,
+    }
+
+
+def get_latest_version(conn, report_name):
+    """Return the newest snapshot version for a report, or None."""
+    return fetch_one(conn, "reports.latest_version", (report_name,))[0]
+
+
+def prune_report_history(conn, keep_versions=5):
+    """
+    Delete old snapshot versions and change log rows that every report
+    has already consumed. Returns (snapshots_deleted, changes_deleted).
+    """
+    snapshots_deleted = execute(conn, "reports.prune_snapshots", (keep_versions,)).rowcount
+    changes_deleted = execute(conn, "reports.prune_changes").rowcount
+    conn.commit()
+    return snapshots_deleted, changes_deleted
@@ -69,9 +69,81 @@ def create_it_tickets_table(conn):
     conn.commit()
 
 
+def create_indexes(conn):
+    """Create indexes used by the incident and ticket filters."""
+    cursor = conn.cursor()
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_incidents_type ON cyber_incidents (incident_type)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_incidents_severity_status ON cyber_incidents (severity, status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_incidents_status ON cyber_incidents (status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_incidents_date ON cyber_incidents (date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_incidents_reported_by ON cyber_incidents (reported_by)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tickets_status_priority ON it_tickets (status, priority)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tickets_assigned_to ON it_tickets (assigned_to)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tickets_created_date ON it_tickets (created_date)")
+    conn.commit()
+
+
+# Columns captured by the change log for each table that reports read
+REPORT_SOURCE_COLUMNS = {
+    "cyber_incidents": ["date", "incident_type", "severity", "status", "reported_by"],
+    "it_tickets": ["priority", "status", "category", "created_date", "resolved_date", "assigned_to"],
+    "datasets_metadata": ["dataset_name", "category", "last_updated", "record_count", "file_size_mb"],
+}
+
+
+def create_report_tables(conn):
+    """
+    Create the report snapshot and change log tables, plus the triggers
+    that record every insert/update/delete on the report source tables.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS report_snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            report_name TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            change_seq INTEGER NOT NULL,
+            state TEXT NOT NULL,
+            result TEXT NOT NULL,
+            generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (report_name, version)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS report_change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            old_row TEXT,
+            new_row TEXT
+        )
+    """)
+
+    for table, columns in REPORT_SOURCE_COLUMNS.items():
+        old_json = "json_object(" + ", ".join(f"'{c}', OLD.{c}" for c in columns) + ")"
+        new_json = "json_object(" + ", ".join(f"'{c}', NEW.{c}" for c in columns) + ")"
+        triggers = {
+            "insert": ("NEW.id", "NULL", new_json),
+            "update": ("NEW.id", old_json, new_json),
+            "delete": ("OLD.id", old_json, "NULL"),
+        }
+        for event, (row_id, old_row, new_row) in triggers.items():
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_report_{event}
+                AFTER {event.upper()} ON {table}
+                BEGIN
+                    INSERT INTO report_change_log (table_name, row_id, old_row, new_row)
+                    VALUES ('{table}', {row_id}, {old_row}, {new_row});
+                END
+            """)
+    conn.commit()
+
+
 def create_all_tables(conn):
     """Create all tables needed for the platform."""
     create_users_table(conn)
     create_cyber_incidents_table(conn)
     create_datasets_metadata_table(conn)
     create_it_tickets_table(conn)
+    create_indexes(conn)
+    create_report_tables(conn)
@@ -0,0 +1,14 @@
+from app.data.db import get_connection
+from app.data.queries import ticket_filter
+
+
+def get_tickets(priority=None, status=None, category=None, assigned_to=None,
+                created_from=None, created_to=None):
+    """
+    Return IT tickets matching the given filters as a pandas DataFrame.
+    Each filter accepts a single value or a list; dates are inclusive ISO strings.
+    """
+    query = ticket_filter(priority, status, category, assigned_to, created_from, created_to)
+    conn = get_connection()
+    df = query.read_frame(conn)
+    return df
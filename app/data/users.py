@@ -1,26 +1,28 @@
-from app.data.db import connect_database
+from app.data.db import get_connection
+from app.data.queries import execute, fetch_one
 
 
 def get_user_by_username(username: str):
     """Retrieve a single user row by username, or None."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT * FROM users WHERE username = ?",
-        (username,)
-    )
-    user = cursor.fetchone()
-    conn.close()
+    conn = get_connection()
+    user = fetch_one(conn, "users.get_by_username", (username,))
     return user
 
 
 def insert_user(username: str, password_hash: str, role: str = "user"):
     """Insert a new user into the users table."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-        (username, password_hash, role)
-    )
+    conn = get_connection()
+    execute(conn, "users.insert", (username, password_hash, role))
     conn.commit()
-    conn.close()
+
+
+def update_password_hash(username: str, password_hash: str, expected_hash: str):
+    """
+    Replace a user's password hash only if it still equals expected_hash.
+    Returns rows updated (0 if the hash was changed in the meantime).
+    """
+    conn = get_connection()
+    cursor = execute(conn, "users.update_password_hash", (password_hash, username, expected_hash))
+    conn.commit()
+    rows_updated = cursor.rowcount
+    return rows_updated
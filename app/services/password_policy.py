@@ -0,0 +1,163 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from app.data.users import update_password_hash
+
+DEFAULT_COST = 12
+MIN_COST = 10
+MAX_COST = 16
+TARGET_VERIFY_MS = 250
+
+# Rehash stronger hashes down to the policy cost on login (off by default)
+ALLOW_COST_DOWNGRADE = False
+
+_policy = {"cost": DEFAULT_COST}
+_rehash_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rehash")
+_pending_rehashes = set()
+
+
+def get_cost():
+    """Return the bcrypt cost currently used for new hashes."""
+    return _policy["cost"]
+
+
+def set_cost(cost):
+    """Set the bcrypt cost used for new hashes."""
+    if not 4 <= cost <= 31:
+        raise ValueError(f"bcrypt cost must be between 4 and 31, got {cost}")
+    _policy["cost"] = cost
+
+
+def hash_password(password, cost=None):
+    """
+    Hash a plain text password with the policy cost.
+
+    Args:
+        password: Plain text password
+        cost: Optional bcrypt cost overriding the policy
+
+    Returns:
+        str: bcrypt hash (utf-8)
+    """
+    salt = bcrypt.gensalt(rounds=cost or get_cost())
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+
+def hash_cost(stored_hash):
+    """Return the cost encoded in a bcrypt hash ("$2b$12$..."), or None."""
+    parts = stored_hash.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def needs_rehash(stored_hash, allow_downgrade=None):
+    """
+    Return True if a stored hash should be replaced on the next login.
+
+    Hashes weaker than the policy (or with an unreadable cost) are always
+    upgraded. Stronger hashes are only lowered when allow_downgrade (default:
+    ALLOW_COST_DOWNGRADE) is True.
+    """
+    if allow_downgrade is None:
+        allow_downgrade = ALLOW_COST_DOWNGRADE
+    cost = hash_cost(stored_hash)
+    if cost is None or cost < get_cost():
+        return True
+    return allow_downgrade and cost > get_cost()
+
+
+def time_verify(cost, rounds=3):
+    """Return the fastest of several checkpw timings at a cost, in milliseconds."""
+    password = b"calibration-password"
+    hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds=cost))
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        bcrypt.checkpw(password, hashed)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def calibrate_cost(target_ms=TARGET_VERIFY_MS, min_cost=MIN_COST, max_cost=MAX_COST):
+    """
+    Pick the highest cost whose verify time stays within target_ms.
+
+    Only min_cost is measured; each extra cost step doubles the work, so
+    higher costs are extrapolated. The chosen cost becomes the policy.
+
+    Returns:
+        int: The chosen cost
+    """
+    base_ms = time_verify(min_cost)
+    cost = min_cost
+    while cost < max_cost and base_ms * 2 ** (cost + 1 - min_cost) <= target_ms:
+        cost += 1
+    set_cost(cost)
+    print(f"bcrypt cost {cost} (~{base_ms * 2 ** (cost - min_cost):.0f} ms per verify)")
+    return cost
+
+
+def schedule_rehash(username, password, stored_hash):
+    """
+    Rehash a password with the policy cost and store it in the background.
+
+    Call only after the password has been verified against stored_hash. The
+    new hash is written only if the stored hash is still stored_hash, so a
+    password change made in the meantime is never overwritten.
+    """
+    def rehash():
+        update_password_hash(username, hash_password(password), stored_hash)
+
+    def finished(future):
+        _pending_rehashes.discard(future)
+        error = future.exception()
+        if error is not None:
+            print(f"Rehash for user '{username}' failed: {error}")
+
+    future = _rehash_executor.submit(rehash)
+    _pending_rehashes.add(future)
+    future.add_done_callback(finished)
+    return future
+
+
+def wait_for_rehashes():
+    """Block until scheduled rehashes have finished. Returns the number waited on."""
+    pending = list(_pending_rehashes)
+    for future in pending:
+        future.exception()
+    return len(pending)
+
+
+def benchmark_login_throughput(costs=range(MIN_COST, MAX_COST + 1), seconds=1.0):
+    """
+    Measure single-core login verifications per second at each cost.
+
+    Returns:
+        dict: {cost: verifies_per_second}
+    """
+    password = b"benchmark-password"
+    results = {}
+
+    print(f"{'Cost':<6} {'ms/verify':<12} {'logins/s/core':<15}")
+    print("-" * 35)
+    for cost in costs:
+        hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds=cost))
+        count = 0
+        start = time.perf_counter()
+        while True:
+            bcrypt.checkpw(password, hashed)
+            count += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= seconds:
+                break
+        results[cost] = count / elapsed
+        print(f"{cost:<6} {elapsed * 1000 / count:<12.1f} {results[cost]:<15.2f}")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_login_throughput()
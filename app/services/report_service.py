@@ -0,0 +1,325 @@
+import json
+import sqlite3
+import time
+from datetime import date, datetime
+
+from app.data.db import connect_database, get_connection
+from app.data.reports import (
+    advance_snapshot,
+    get_changes_since,
+    get_latest_snapshot,
+    get_latest_version,
+    get_max_change_seq,
+    get_source_rows,
+    insert_snapshot,
+    prune_report_history,
+)
+
+# Hours (24h clock, local time) in which the scheduler regenerates reports
+OFF_PEAK_HOURS = (1, 5)
+
+# Maximum days to resolve a ticket, by priority
+SLA_DAYS = {"Critical": 1, "High": 1, "Medium": 3, "Low": 7}
+
+CLOSED_STATUSES = ("Closed", "Resolved")
+
+# Returned by a report's key function for rows the report does not count
+SKIP = object()
+
+# In-process copy of the newest (version, result) per report; readers only
+# check the latest version number before reusing it
+_latest_results = {}
+
+
+class Report:
+    """
+    A report defined as additive sums grouped by a key.
+
+    key(row) returns the group key for a source row (SKIP to leave the row
+    out; None is kept as its own group, like SQL GROUP BY does for NULL),
+    values(row) returns a tuple of numbers to add to that group, and
+    finalize(groups) turns {key: sums} into the stored result. Because
+    the sums are additive, a changed row is applied by subtracting its old
+    contribution and adding its new one. present(result), if given, adds
+    time-dependent fields when the report is read.
+    """
+
+    def __init__(self, name, table, key, values, finalize, present=None):
+        self.name = name
+        self.table = table
+        self.key = key
+        self.values = values
+        self.finalize = finalize
+        self.present = present
+
+    def add(self, groups, row, sign=1):
+        """Add (sign=1) or remove (sign=-1) one row's contribution."""
+        key = self.key(row)
+        if key is SKIP:
+            return
+        contribution = self.values(row)
+        sums = groups.setdefault(key, [0] * len(contribution))
+        for i, value in enumerate(contribution):
+            sums[i] += sign * value
+        if not any(sums):
+            del groups[key]
+
+
+def parse_date(value):
+    """Return a date from an ISO string, or None."""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def count_one(row):
+    return (1,)
+
+
+def finalize_counts(groups):
+    """Return {key: count} ordered by count descending."""
+    ordered = sorted(groups.items(), key=lambda item: (-item[1][0], str(item[0])))
+    return {key: sums[0] for key, sums in ordered}
+
+
+def ticket_sla_values(row):
+    """(tickets, open, resolved, within_sla, resolution_days) for one ticket."""
+    created = parse_date(row["created_date"])
+    resolved = parse_date(row["resolved_date"])
+    is_open = 0 if row["status"] in CLOSED_STATUSES else 1
+    if created and resolved:
+        days = (resolved - created).days
+        within_sla = 1 if days <= SLA_DAYS.get(row["priority"], 7) else 0
+        return (1, is_open, 1, within_sla, days)
+    return (1, is_open, 0, 0, 0)
+
+
+def finalize_ticket_sla(groups):
+    result = {}
+    ordered = sorted(groups.items(), key=lambda item: str(item[0]))
+    for priority, (tickets, open_count, resolved, within_sla, days) in ordered:
+        result[priority] = {
+            "tickets": tickets,
+            "open": open_count,
+            "resolved": resolved,
+            "within_sla": within_sla,
+            "sla_rate": round(within_sla / resolved, 3) if resolved else None,
+            "avg_resolution_days": round(days / resolved, 2) if resolved else None,
+        }
+    return result
+
+
+def finalize_dataset_freshness(groups):
+    """Return the newest last_updated date per dataset."""
+    newest = {}
+    for dataset_name, last_updated in groups:
+        if last_updated and (dataset_name not in newest or last_updated > newest[dataset_name]):
+            newest[dataset_name] = last_updated
+    return {dataset_name: {"last_updated": newest[dataset_name]} for dataset_name in sorted(newest)}
+
+
+def present_dataset_freshness(result):
+    """Add each dataset's age in days as of today."""
+    today = date.today()
+    presented = {}
+    for dataset_name, info in result.items():
+        updated = parse_date(info["last_updated"])
+        presented[dataset_name] = {
+            "last_updated": info["last_updated"],
+            "age_days": (today - updated).days if updated else None,
+        }
+    return presented
+
+
+REPORTS = {
+    report.name: report
+    for report in [
+        Report("incidents_by_type", "cyber_incidents",
+               lambda row: row["incident_type"], count_one, finalize_counts),
+        Report("incidents_by_severity", "cyber_incidents",
+               lambda row: row["severity"], count_one, finalize_counts),
+        Report("incidents_by_status", "cyber_incidents",
+               lambda row: row["status"], count_one, finalize_counts),
+        Report("high_severity_by_status", "cyber_incidents",
+               lambda row: row["status"] if row["severity"] == "High" else SKIP,
+               count_one, finalize_counts),
+        Report("ticket_sla_by_priority", "it_tickets",
+               lambda row: row["priority"], ticket_sla_values, finalize_ticket_sla),
+        Report("dataset_freshness", "datasets_metadata",
+               lambda row: (row["dataset_name"], row["last_updated"]), count_one,
+               finalize_dataset_freshness, present_dataset_freshness),
+    ]
+}
+
+
+def encode_state(groups):
+    """JSON-friendly form of {key: sums} (keys may be tuples)."""
+    return [[list(key) if isinstance(key, tuple) else key, sums] for key, sums in groups.items()]
+
+
+def decode_state(state):
+    return {tuple(key) if isinstance(key, list) else key: sums for key, sums in state}
+
+
+def refresh_reports(names=None, full=False, conn=None):
+    """
+    Bring report snapshots up to date.
+
+    Reports without a snapshot (or all reports when full=True) are built
+    from a full scan of their source table. Otherwise only rows recorded
+    in report_change_log since the last snapshot are applied. Table scans
+    and change log reads are shared between reports that use the same table.
+
+    Args:
+        names: Report names to refresh (default: all)
+        full: Rebuild from scratch instead of applying changes
+        conn: Optional connection with no open transaction (by default a
+              dedicated connection is opened and closed)
+
+    Returns:
+        dict: {report_name: "full" | "incremental" | "fresh" | "concurrent"}
+    """
+    names = list(names or REPORTS)
+    unknown = [name for name in names if name not in REPORTS]
+    if unknown:
+        raise ValueError(f"Unknown reports: {', '.join(unknown)}")
+
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_database()
+    elif conn.in_transaction:
+        raise ValueError("refresh_reports() needs a connection without an open transaction")
+
+    try:
+        return _refresh_reports(conn, names, full)
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def _refresh_reports(conn, names, full):
+    source_rows = {}
+    changes = {}
+    pending = []
+    advanced = []
+    outcome = {}
+
+    # Read everything in one transaction so the change_seq matches the data
+    conn.execute("BEGIN")
+    try:
+        current_seq = get_max_change_seq(conn)
+        for name in names:
+            report = REPORTS[name]
+            latest = get_latest_snapshot(conn, name)
+
+            if full or latest is None:
+                if report.table not in source_rows:
+                    source_rows[report.table] = get_source_rows(conn, report.table)
+                groups = {}
+                for row in source_rows[report.table]:
+                    report.add(groups, row)
+                outcome[name] = "full"
+            elif latest["change_seq"] == current_seq:
+                _latest_results[name] = (latest["version"], latest["result"])
+                outcome[name] = "fresh"
+                continue
+            else:
+                cache_key = (report.table, latest["change_seq"])
+                if cache_key not in changes:
+                    changes[cache_key] = get_changes_since(conn, *cache_key)
+                if not changes[cache_key]:
+                    # Nothing in this report's table changed; record that it
+                    # has caught up so the change log can be pruned
+                    advanced.append((name, latest["version"]))
+                    _latest_results[name] = (latest["version"], latest["result"])
+                    outcome[name] = "fresh"
+                    continue
+                groups = decode_state(latest["state"])
+                for old_row, new_row in changes[cache_key]:
+                    if old_row is not None:
+                        report.add(groups, old_row, sign=-1)
+                    if new_row is not None:
+                        report.add(groups, new_row)
+                outcome[name] = "incremental"
+
+            version = latest["version"] + 1 if latest else 1
+            pending.append((name, version, groups))
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit()
+
+    for name, version in advanced:
+        advance_snapshot(conn, name, version, current_seq)
+
+    for name, version, groups in pending:
+        result = REPORTS[name].finalize(groups)
+        try:
+            insert_snapshot(conn, name, version, current_seq, encode_state(groups), result)
+        except sqlite3.IntegrityError:
+            # An overlapping refresh already published this version
+            conn.rollback()
+            _latest_results.pop(name, None)
+            outcome[name] = "concurrent"
+            continue
+        # Cache the result in the same form readers load from the database
+        _latest_results[name] = (version, json.loads(json.dumps(result)))
+
+    return outcome
+
+
+def get_latest_report(name, conn=None):
+    """
+    Return the newest published result for a report, or None.
+
+    Only the latest version number is read (an index lookup); the full
+    snapshot is loaded again only when another process has published a
+    newer version.
+    """
+    if conn is None:
+        conn = get_connection()
+    version = get_latest_version(conn, name)
+    cached = _latest_results.get(name)
+    if version is not None and (cached is None or cached[0] != version):
+        latest = get_latest_snapshot(conn, name)
+        cached = (latest["version"], latest["result"])
+        _latest_results[name] = cached
+    if version is None:
+        return None
+    present = REPORTS[name].present if name in REPORTS else None
+    return present(cached[1]) if present else cached[1]
+
+
+def is_off_peak(now=None, window=OFF_PEAK_HOURS):
+    """Return True if now falls inside the [start, end) hour window."""
+    hour = (now or datetime.now()).hour
+    start, end = window
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+def run_report_scheduler(interval_seconds=900, window=OFF_PEAK_HOURS, max_runs=None):
+    """
+    Refresh all reports every interval_seconds while inside the off-peak window.
+
+    Args:
+        interval_seconds: Seconds between checks
+        window: (start_hour, end_hour) off-peak window
+        max_runs: Stop after this many refreshes (default: run forever)
+    """
+    runs = 0
+    while max_runs is None or runs < max_runs:
+        if is_off_peak(window=window):
+            outcome = refresh_reports()
+            prune_report_history(get_connection())
+            runs += 1
+            print(f"[{datetime.now():%Y-%m-%d %H:%M}] Reports refreshed: {outcome}")
+        time.sleep(interval_seconds)
+
+
+if __name__ == "__main__":
+    run_report_scheduler()
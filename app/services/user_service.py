@@ -3,7 +3,9 @@ from pathlib import Path
 
 import bcrypt
 
-from app.data.db import connect_database
+from app.data.db import get_connection
+from app.data.queries import execute, fetch_one
+from app.services.password_policy import hash_password, needs_rehash, schedule_rehash
 
 DATA_DIR = Path("DATA")
 
@@ -20,34 +22,24 @@ def register_user(username, password, role="user"):
     Returns:
         tuple: (success: bool, message: str)
     """
-    conn = connect_database()
-    cursor = conn.cursor()
+    conn = get_connection()
 
     # Check if user already exists
-    cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-    if cursor.fetchone():
-        conn.close()
+    if fetch_one(conn, "users.get_by_username", (username,)):
         return False, f"Username '{username}' already exists."
 
-    # Hash the password
-    password_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    password_hash = hashed.decode("utf-8")
+    # Hash the password with the policy cost
+    password_hash = hash_password(password)
 
     # Insert new user
-    cursor.execute(
-        "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-        (username, password_hash, role),
-    )
+    execute(conn, "users.insert", (username, password_hash, role))
     conn.commit()
-    conn.close()
 
     return True, f"User '{username}' registered successfully!"
 
 
 import bcrypt
-from app.data.db import connect_database
+from app.data.db import get_connection
 
 def login_user(username, password):
     """
@@ -60,13 +52,10 @@ def login_user(username, password):
     Returns:
         tuple: (success: bool, message: str)
     """
-    conn = connect_database()
-    cursor = conn.cursor()
+    conn = get_connection()
     
     # Find user
-    cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-    user = cursor.fetchone()
-    conn.close()
+    user = fetch_one(conn, "users.get_by_username", (username,))
     
     if not user:
         return False, "Username not found."
@@ -77,6 +66,9 @@ def login_user(username, password):
     hash_bytes = stored_hash.encode('utf-8')
     
     if bcrypt.checkpw(password_bytes, hash_bytes):
+        # Upgrade legacy/outdated hashes without delaying the login
+        if needs_rehash(stored_hash):
+            schedule_rehash(username, password, stored_hash)
         return True, f"Welcome, {username}!"
     else:
         return False, "Invalid password."
@@ -102,8 +94,7 @@ def migrate_users_from_file(filepath=DATA_DIR / "users.txt"):
         print("   No users to migrate.")
         return 0
 
-    conn = connect_database()
-    cursor = conn.cursor()
+    conn = get_connection()
     migrated_count = 0
 
     with filepath.open("r", encoding="utf-8") as f:
@@ -118,10 +109,8 @@ def migrate_users_from_file(filepath=DATA_DIR / "users.txt"):
                 password_hash = parts[1].strip()
 
                 try:
-                    cursor.execute(
-                        "INSERT OR IGNORE INTO users (username, password_hash, role) "
-                        "VALUES (?, ?, ?)",
-                        (username, password_hash, "user"),
+                    cursor = execute(
+                        conn, "users.insert_or_ignore", (username, password_hash, "user")
                     )
                     if cursor.rowcount > 0:
                         migrated_count += 1
@@ -129,6 +118,5 @@ def migrate_users_from_file(filepath=DATA_DIR / "users.txt"):
                     print(f"Error migrating user {username}: {e}")
 
     conn.commit()
-    conn.close()
     print(f"✅ Migrated {migrated_count} users from {filepath.name}")
     return migrated_count
@@ -2,12 +2,14 @@ from pathlib import Path
 import re
 import bcrypt
 
+from app.services.password_policy import get_cost
+
 USER_DATA_FILE = Path("users.txt")  
 
 def hash_password(plain_text_password: str) -> str:
     """Return bcrypt hash (utf-8 str) of the given password."""
     password_bytes = plain_text_password.encode("utf-8")
-    salt = bcrypt.gensalt()  # default cost is fine for CLI use
+    salt = bcrypt.gensalt(rounds=get_cost())
     hashed_password = bcrypt.hashpw(password_bytes, salt)
     return hashed_password.decode("utf-8")
 
@@ -1,9 +1,11 @@
 from pathlib import Path
-import pandas as pd
 
-from app.data.db import connect_database, DB_PATH
+from app.data.db import close_thread_connections, connect_database, DB_PATH
+from app.data.queries import fetch_all, fetch_one, read_frame, print_query_stats
+from app.data.replica import replicas
 from app.data.schema import create_all_tables
 from app.services.user_service import register_user, login_user, migrate_users_from_file
+from app.services.password_policy import calibrate_cost, wait_for_rehashes
 from app.data.incidents import (
     insert_incident,
     get_all_incidents,
@@ -21,20 +23,23 @@ def main():
     print("Week 8: Database Demo")
     print("=" * 60)
 
+    # 0. Tune bcrypt cost to this machine
+    calibrate_cost()
+
     # 1. Setup database
     conn = connect_database()
     create_all_tables(conn)
     conn.close()
 
+    # 1b. Keep read replicas in sync for analytics reads
+    replicas.start()
+
     # 2. Migrate users
     migrate_users_from_file()
 
     # 3. Verify migrated users
     conn = connect_database()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT id, username, role FROM users")
-    users = cursor.fetchall()
+    users = fetch_all(conn, "users.list")
 
     print("\nUsers in database:")
     print(f"{'ID':<5} {'Username':<15} {'Role':<10}")
@@ -51,6 +56,7 @@ def main():
 
     success, msg = login_user("alice", "SecurePass123!")
     print(msg)
+    wait_for_rehashes()
 
     # 5. Test Incident CRUD
     incident_id = insert_incident(
@@ -93,7 +99,6 @@ def setup_database_complete():
     load_csv_to_table("DATA/it_tickets.csv", "it_tickets")
 
     # Step 4: Verify table counts
-    cursor = conn.cursor()
     tables = ["users", "cyber_incidents", "datasets_metadata", "it_tickets"]
 
     print("\nDatabase Summary:")
@@ -101,8 +106,7 @@ def setup_database_complete():
     print("-" * 40)
 
     for table in tables:
-        cursor.execute(f"SELECT COUNT(*) FROM {table}")
-        count = cursor.fetchone()[0]
+        count = fetch_one(conn, f"count.{table}")[0]
         print(f"{table:<25} {count:<10}")
 
     conn.close()
@@ -142,11 +146,7 @@ def run_comprehensive_tests():
     print(f"  Create: Incident #{test_id} created")
 
     # Read
-    df = pd.read_sql_query(
-        "SELECT * FROM cyber_incidents WHERE id = ?",
-        conn,
-        params=(test_id,)
-    )
+    df = read_frame(conn, "incidents.get_by_id", (test_id,))
     print(f"  Read:   Found incident #{test_id}")
 
     # Update
@@ -168,6 +168,10 @@ def run_comprehensive_tests():
 
     conn.close()
 
+    # Test 4: Statement timings
+    print("\n[TEST 4] Hottest statements")
+    print_query_stats(limit=5)
+
     print("\n" + "=" * 60)
     print("✅ ALL TESTS PASSED!")
     print("=" * 60)
@@ -175,7 +179,11 @@ def run_comprehensive_tests():
 
 
 if __name__ == "__main__":
-    main()                   # Week 8 demo
-    run_comprehensive_tests()  # Full testing suite
-    setup_database_complete()
+    try:
+        main()                   # Week 8 demo
+        run_comprehensive_tests()  # Full testing suite
+        setup_database_complete()
+    finally:
+        replicas.stop()
+        close_thread_connections()
 